@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted (queue full or wait timed out)"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the remaining request budget cannot cover a stage"""
+
+
+class Deadline:
+    """
+    Per-request time budget
+
+    Created when the request arrives, so time spent waiting in the admission
+    queue counts against the same budget as retrieval and generation.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Check if the deadline has passed"""
+        return self.remaining() <= 0.0
+
+    def covers(self, budget: float) -> bool:
+        """Check if at least `budget` seconds remain"""
+        return self.remaining() >= budget
+
+
+class AdmissionController:
+    """
+    Global admission control for a single endpoint
+
+    Allows at most `max_concurrency` requests to run at once and at most
+    `max_queue` more to wait for a slot. Anything beyond that is rejected
+    immediately instead of joining an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        timeout: float,
+        retry_after: int = 1
+    ):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str) -> "AdmissionController":
+        """Build a controller from `<PREFIX>_MAX_CONCURRENCY`, `_MAX_QUEUE` and `_TIMEOUT`"""
+        return cls(
+            name=name,
+            max_concurrency=int(os.getenv(f"{prefix}_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", "16")),
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", "20")),
+            retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "1")),
+        )
+
+    @asynccontextmanager
+    async def admit(self, timeout: Optional[float] = None) -> AsyncIterator[Deadline]:
+        """
+        Wait for a slot and yield the request deadline
+
+        Raises:
+            AdmissionRejected: if the queue is full or no slot frees up
+                before the deadline
+        """
+        deadline = Deadline(self.timeout if timeout is None else timeout)
+
+        # Bound the combined count: when a slot is freed, `active` drops before
+        # the woken waiter resumes, so checking each count alone would let a
+        # burst slip into the queue during the hand-off
+        if self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            raise AdmissionRejected(
+                f"{self.name} is overloaded. Please try again later.",
+                retry_after=self.retry_after
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            raise AdmissionRejected(
+                f"{self.name} is busy. Please try again later.",
+                retry_after=self.retry_after
+            )
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            yield deadline
+        finally:
+            self.active -= 1
+            self._semaphore.release()
@@ -1,7 +1,9 @@
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 
+from admission import Deadline
+
 load_dotenv()
 
 
@@ -17,12 +19,14 @@ class SimpleAgent:
         self.max_steps = int(os.getenv("AGENT_MAX_STEPS", 5))
         self.enabled = os.getenv("AGENT_ENABLED", "false").lower() == "true"
     
-    async def execute(self, task: str) -> Dict[str, Any]:
+    async def execute(self, task: str, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
         """
         Execute a task by breaking it down into steps
         
         Args:
             task: Task description
+            deadline: Optional request deadline; remaining steps are skipped
+                once it passes and the status is reported as "timeout"
         
         Returns:
             Dict with steps and status
@@ -43,6 +47,12 @@ class SimpleAgent:
         # Execute each step
         results = []
         for i, step_desc in enumerate(steps, 1):
+            if deadline is not None and deadline.expired():
+                return {
+                    "steps": results,
+                    "status": "timeout"
+                }
+            
             result = await self._execute_step(step_desc, i)
             results.append(result)
             
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 
 from rag import RAGSystem
 from agent import SimpleAgent
+from admission import AdmissionController, AdmissionRejected
 
 load_dotenv()
 
@@ -59,6 +60,21 @@ async def rate_limit_middleware(request: Request, call_next):
     response = await call_next(request)
     return response
 
+# Global admission control: bounded concurrency, bounded wait queue and a
+# per-request deadline for each expensive endpoint
+query_admission = AdmissionController.from_env("Query service", "QUERY")
+agent_admission = AdmissionController.from_env("Agent service", "AGENT")
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Fail fast with 503 instead of letting requests pile up"""
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     """Add security headers to all responses"""
@@ -92,6 +108,7 @@ class QueryResponse(BaseModel):
     response: str
     sources: List[Dict[str, str]]
     offline: bool = False
+    degraded: bool = False
 
 
 class AgentRequest(BaseModel):
@@ -121,24 +138,27 @@ async def query_rag(request: QueryRequest):
     
     Retrieves relevant documents and generates a response using LLM
     """
-    try:
-        result = await rag_system.query(
-            query=request.query,
-            history=request.history
-        )
-        
-        return QueryResponse(
-            response=result["response"],
-            sources=result.get("sources", []),
-            offline=result.get("offline", False)
-        )
-    except Exception as e:
-        # Graceful fallback
-        return QueryResponse(
-            response=f"I encountered an error processing your query. Running in offline mode. Error: {str(e)}",
-            sources=[],
-            offline=True
-        )
+    async with query_admission.admit() as deadline:
+        try:
+            result = await rag_system.query(
+                query=request.query,
+                history=request.history,
+                deadline=deadline
+            )
+            
+            return QueryResponse(
+                response=result["response"],
+                sources=result.get("sources", []),
+                offline=result.get("offline", False),
+                degraded=result.get("degraded", False)
+            )
+        except Exception as e:
+            # Graceful fallback
+            return QueryResponse(
+                response=f"I encountered an error processing your query. Running in offline mode. Error: {str(e)}",
+                sources=[],
+                offline=True
+            )
 
 
 @app.post("/api/agent", response_model=AgentResponse)
@@ -154,15 +174,16 @@ async def run_agent(request: AgentRequest):
             detail="Agent is disabled. Enable it in .env by setting AGENT_ENABLED=true"
         )
     
-    try:
-        result = await agent.execute(task=request.task)
-        
-        return AgentResponse(
-            steps=result["steps"],
-            status=result["status"]
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    async with agent_admission.admit() as deadline:
+        try:
+            result = await agent.execute(task=request.task, deadline=deadline)
+            
+            return AgentResponse(
+                steps=result["steps"],
+                status=result["status"]
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
 
 if __name__ == "__main__":
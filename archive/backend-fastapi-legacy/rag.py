@@ -1,11 +1,16 @@
 import os
 import json
+import asyncio
 import numpy as np
 from typing import List, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
 import faiss
 from dotenv import load_dotenv
 
+from admission import Deadline, DeadlineExceeded
+from rerank import CrossEncoderReranker
+from router import ProviderRouter
+
 load_dotenv()
 
 
@@ -15,6 +20,7 @@ class LLMClient:
     def __init__(self):
         self.provider = os.getenv("LLM_PROVIDER", "mock")
         self.client = None
+        self.router = None
         self._initialize_client()
     
     def _initialize_client(self):
@@ -39,21 +45,66 @@ class LLMClient:
             except Exception as e:
                 print(f"OpenAI initialization failed: {e}. Falling back to mock.")
                 self.provider = "mock"
+        
+        elif self.provider == "router":
+            # Hedged requests across LLM_ROUTER_PROVIDERS
+            try:
+                self.router = ProviderRouter.from_env()
+            except Exception as e:
+                print(f"Provider router initialization failed: {e}. Falling back to mock.")
+                self.provider = "mock"
     
-    async def generate(self, prompt: str, max_tokens: int = 500) -> str:
-        """Generate response from LLM"""
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """
+        Generate response from LLM
+
+        Raises:
+            DeadlineExceeded: if the deadline passes before the provider answers
+        """
         if self.provider == "mock":
             return self._mock_response(prompt)
         
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("No budget left for LLM generation")
+        
+        if self.provider == "router":
+            try:
+                return await self.router.generate(prompt, max_tokens=max_tokens, deadline=deadline)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                print(f"LLM generation failed: {e}. Using mock response.")
+                return self._mock_response(prompt)
+        
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+        }
+        timeout = None
+        if deadline is not None:
+            timeout = deadline.remaining()
+            request["timeout"] = timeout
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=max_tokens,
-                temperature=0.7,
+            # Run the blocking SDK call off the event loop so slow providers
+            # don't stall other requests, and stop waiting at the deadline
+            response = await asyncio.wait_for(
+                asyncio.to_thread(self.client.chat.completions.create, **request),
+                timeout=timeout
             )
             return response.choices[0].message.content
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded("LLM generation did not finish before the deadline")
         except Exception as e:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(f"LLM generation failed at the deadline: {e}")
             print(f"LLM generation failed: {e}. Using mock response.")
             return self._mock_response(prompt)
     
@@ -89,6 +140,16 @@ class RAGSystem:
         self.metadata = []
         self.llm_client = LLMClient()
         
+        # Minimum remaining budget (seconds) needed to attempt LLM generation;
+        # below this the query degrades to returning sources only
+        self.llm_min_budget = float(os.getenv("LLM_MIN_BUDGET", "2"))
+        
+        # Optional cross-encoder reranking: retrieve a wider candidate set
+        # from FAISS and keep only the best k after rescoring
+        self.rerank_enabled = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+        self.rerank_candidates = int(os.getenv("RERANK_CANDIDATES", "20"))
+        self.reranker = None
+        
         self._load_index()
     
     def _load_index(self):
@@ -116,16 +177,76 @@ class RAGSystem:
             print(f"Error loading RAG system: {e}")
             self.embedding_model = None
             self.index = None
+        
+        if self.rerank_enabled:
+            try:
+                self.reranker = CrossEncoderReranker()
+            except Exception as e:
+                print(f"Reranker initialization failed: {e}. Using FAISS ranking only.")
+                self.reranker = None
     
     def is_available(self) -> bool:
         """Check if RAG system is available"""
         return self.embedding_model is not None and self.index is not None
     
+    def retrieve(
+        self,
+        query: str,
+        k: int = 5,
+        deadline: Optional[Deadline] = None,
+        rerank: Optional[bool] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve the top-k documents for a query
+        
+        Args:
+            query: User query string
+            k: Number of documents to return
+            deadline: Optional request deadline; reranking only spends budget
+                that generation won't need
+            rerank: Override whether to rerank (defaults to RERANK_ENABLED)
+        
+        Returns:
+            List of documents with id, text, title and url
+        """
+        use_reranker = self.reranker is not None and (rerank is None or rerank)
+        fetch_k = max(k, self.rerank_candidates) if use_reranker else k
+        
+        # Compute query embedding
+        query_embedding = self.embedding_model.encode([query])[0]
+        query_embedding = np.array([query_embedding], dtype=np.float32)
+        
+        # Search FAISS index
+        distances, indices = self.index.search(query_embedding, fetch_k)
+        
+        candidates = []
+        for idx in indices[0]:
+            # FAISS pads with -1 when the index holds fewer than fetch_k vectors
+            if 0 <= idx < len(self.metadata):
+                doc = self.metadata[idx]
+                candidates.append({
+                    "id": int(idx),
+                    "text": doc["text"],
+                    "title": doc.get("title", f"Document {idx}"),
+                    "url": doc.get("url", "#")
+                })
+        
+        if not use_reranker:
+            return candidates[:k]
+        
+        budget_ms = None
+        if deadline is not None:
+            spare = deadline.remaining() - self.llm_min_budget
+            budget_ms = max(0.0, min(self.reranker.budget_ms, spare * 1000))
+        
+        return self.reranker.rerank(query, candidates, top_n=k, budget_ms=budget_ms)
+    
     async def query(
         self,
         query: str,
         history: Optional[List[Dict[str, str]]] = None,
-        k: int = 5
+        k: int = 5,
+        deadline: Optional[Deadline] = None
     ) -> Dict[str, Any]:
         """
         Query the RAG system
@@ -134,9 +255,11 @@ class RAGSystem:
             query: User query string
             history: Conversation history
             k: Number of documents to retrieve
+            deadline: Optional request deadline; when the remaining budget
+                can't cover generation, only the sources are returned
         
         Returns:
-            Dict with response, sources, and offline flag
+            Dict with response, sources, offline and degraded flags
         """
         if not self.is_available():
             return {
@@ -145,25 +268,24 @@ class RAGSystem:
                 "offline": True
             }
         
+        if deadline is not None and deadline.expired():
+            return {
+                "response": "The request ran out of time before retrieval could start.",
+                "sources": [],
+                "offline": False,
+                "degraded": True
+            }
+        
         try:
-            # Compute query embedding
-            query_embedding = self.embedding_model.encode([query])[0]
-            query_embedding = np.array([query_embedding], dtype=np.float32)
-            
-            # Search FAISS index
-            distances, indices = self.index.search(query_embedding, k)
+            # Retrieve documents off the event loop; embedding and reranking
+            # are CPU-bound and would otherwise stall every other request
+            docs = await asyncio.to_thread(self.retrieve, query, k=k, deadline=deadline)
+            retrieved_docs = [doc["text"] for doc in docs]
+            sources = [{"title": doc["title"], "url": doc["url"]} for doc in docs]
             
-            # Retrieve documents
-            retrieved_docs = []
-            sources = []
-            for idx in indices[0]:
-                if idx < len(self.metadata):
-                    doc = self.metadata[idx]
-                    retrieved_docs.append(doc["text"])
-                    sources.append({
-                        "title": doc.get("title", f"Document {idx}"),
-                        "url": doc.get("url", "#")
-                    })
+            # Skip generation if the remaining budget can't cover it
+            if deadline is not None and not deadline.covers(self.llm_min_budget):
+                return self._sources_only(sources)
             
             # Build prompt
             context = "\n\n".join(retrieved_docs)
@@ -177,12 +299,16 @@ Question: {query}
 Answer:"""
             
             # Generate response
-            response = await self.llm_client.generate(prompt)
+            try:
+                response = await self.llm_client.generate(prompt, deadline=deadline)
+            except DeadlineExceeded:
+                return self._sources_only(sources)
             
             return {
                 "response": response,
                 "sources": sources,
-                "offline": self.llm_client.provider == "mock"
+                "offline": self.llm_client.provider == "mock",
+                "degraded": False
             }
         
         except Exception as e:
@@ -192,3 +318,12 @@ Answer:"""
                 "sources": [],
                 "offline": True
             }
+    
+    def _sources_only(self, sources: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Degraded response with retrieved sources but no generated answer"""
+        return {
+            "response": "The answer could not be generated in time. Here are the most relevant sources.",
+            "sources": sources,
+            "offline": False,
+            "degraded": True
+        }
@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class ScoreCache:
+    """
+    Bounded LRU cache of cross-encoder scores keyed by (query, doc_id)
+
+    Retrieval runs in worker threads, so every access holds a lock.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._scores: "OrderedDict[Tuple[str, Any], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query: str, doc_id: Any) -> Optional[float]:
+        """Return a cached score and mark it as recently used"""
+        key = (query, doc_id)
+        with self._lock:
+            if key not in self._scores:
+                return None
+            self._scores.move_to_end(key)
+            return self._scores[key]
+
+    def put(self, query: str, doc_id: Any, score: float):
+        """Store a score, evicting the least recently used entry if full"""
+        if self.max_size <= 0:
+            return
+        key = (query, doc_id)
+        with self._lock:
+            self._scores[key] = score
+            self._scores.move_to_end(key)
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached scores"""
+        with self._lock:
+            self._scores.clear()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class CrossEncoderReranker:
+    """
+    Rescores retrieved candidates with a small CPU cross-encoder
+
+    Candidates are scored in batches until the per-request compute budget
+    runs out. Scored candidates are ranked by score; any left unscored keep
+    their retrieval order after them, so an exhausted budget degrades to the
+    plain FAISS ranking rather than dropping documents.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        model: Any = None
+    ):
+        self.model_name = model_name or os.getenv(
+            "RERANK_MODEL",
+            "cross-encoder/ms-marco-MiniLM-L-6-v2"
+        )
+        self.batch_size = batch_size or int(os.getenv("RERANK_BATCH_SIZE", "8"))
+        self.budget_ms = budget_ms if budget_ms is not None else float(os.getenv("RERANK_BUDGET_MS", "150"))
+        self.cache = ScoreCache(
+            cache_size if cache_size is not None else int(os.getenv("RERANK_CACHE_SIZE", "1024"))
+        )
+        self.model = model
+
+        if self.model is None:
+            from sentence_transformers import CrossEncoder
+            self.model = CrossEncoder(self.model_name, device="cpu")
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        top_n: int,
+        budget_ms: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rerank candidates and keep the best `top_n`
+
+        Args:
+            query: User query string
+            candidates: Retrieved documents in retrieval order; each needs
+                "id" and "text" keys
+            top_n: Number of documents to keep
+            budget_ms: Compute budget for this call (defaults to RERANK_BUDGET_MS)
+
+        Returns:
+            The top `top_n` candidates, best first
+        """
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        started = time.perf_counter()
+
+        scores: Dict[int, float] = {}
+        pending = []
+        for position, doc in enumerate(candidates):
+            cached = self.cache.get(query, doc["id"])
+            if cached is None:
+                pending.append(position)
+            else:
+                scores[position] = cached
+
+        for start in range(0, len(pending), self.batch_size):
+            if time.perf_counter() - started >= budget:
+                break
+
+            batch = pending[start:start + self.batch_size]
+            pairs = [(query, candidates[position]["text"]) for position in batch]
+            batch_scores = self.model.predict(pairs, batch_size=self.batch_size)
+
+            for position, score in zip(batch, batch_scores):
+                scores[position] = float(score)
+                self.cache.put(query, candidates[position]["id"], float(score))
+
+        scored = sorted(scores, key=lambda position: scores[position], reverse=True)
+        unscored = [position for position in range(len(candidates)) if position not in scores]
+
+        return [candidates[position] for position in scored + unscored][:top_n]
@@ -0,0 +1,344 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, List, Optional
+from dotenv import load_dotenv
+
+from admission import Deadline, DeadlineExceeded
+
+load_dotenv()
+
+
+# Defaults for the providers LLMClient already knows about; any other name
+# is configured entirely through <NAME>_BASE_URL / _API_KEY / _MODEL
+PROVIDER_DEFAULTS: Dict[str, Dict[str, Optional[str]]] = {
+    "openrouter": {
+        "base_url": "https://openrouter.ai/api/v1",
+        "model": "anthropic/claude-3.5-sonnet",
+    },
+    "openai": {
+        "base_url": None,
+        "model": "gpt-4-turbo",
+    },
+}
+
+
+class NoProviderAvailable(Exception):
+    """Raised when every provider is failing or has an open circuit breaker"""
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker
+
+    Opens after `failure_threshold` consecutive failures. Once `reset_timeout`
+    seconds have passed it is half-open: a single trial request may be in
+    flight at a time. A successful trial closes the breaker and a failed one
+    re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Check if a request could be sent now (doesn't reserve the trial)"""
+        state = self.state
+        return state == "closed" or (state == "half_open" and not self.trial_in_flight)
+
+    def acquire(self) -> bool:
+        """Reserve permission to send; in half-open state this takes the single trial slot"""
+        if not self.allow():
+            return False
+        if self.state == "half_open":
+            self.trial_in_flight = True
+        return True
+
+    def release(self):
+        """Give back a trial slot that ended without a verdict (cancelled or out of time)"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Rolling window of time-to-first-token samples (seconds)
+    """
+
+    def __init__(self, window: int = 100):
+        self.samples = deque(maxlen=window)
+        self.attempts = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def record_censored(self, seconds: float):
+        """
+        Record a lower bound from an attempt that never produced a token
+
+        Only kept when it exceeds the current median, so it can push a slow
+        provider's estimate up but never make it look faster than it is.
+        """
+        median = self.percentile(50)
+        if median is None or seconds > median:
+            self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile (nearest rank), or None without samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(0, min(len(ordered) - 1, int(round(p / 100.0 * len(ordered))) - 1))
+        return ordered[rank]
+
+
+class Provider:
+    """An OpenAI-compatible chat completions endpoint with its own health state"""
+
+    def __init__(
+        self,
+        name: str,
+        client,
+        model: str,
+        breaker: Optional[CircuitBreaker] = None,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.breaker = breaker or CircuitBreaker()
+        self.tracker = tracker or LatencyTracker()
+
+    @classmethod
+    def from_env(cls, name: str) -> "Provider":
+        """Build a provider from `<NAME>_BASE_URL`, `<NAME>_API_KEY` and `<NAME>_MODEL`"""
+        from openai import AsyncOpenAI
+
+        prefix = name.upper()
+        defaults = PROVIDER_DEFAULTS.get(name, {})
+        base_url = os.getenv(f"{prefix}_BASE_URL", defaults.get("base_url"))
+        if name not in PROVIDER_DEFAULTS and not base_url:
+            raise ValueError(f"{prefix}_BASE_URL is required for provider '{name}'")
+
+        return cls(
+            name=name,
+            client=AsyncOpenAI(base_url=base_url, api_key=os.getenv(f"{prefix}_API_KEY", "not-set")),
+            model=os.getenv(f"{prefix}_MODEL", defaults.get("model") or "default"),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "3")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+            ),
+            tracker=LatencyTracker(window=int(os.getenv("LLM_LATENCY_WINDOW", "100"))),
+        )
+
+    async def stream(
+        self,
+        prompt: str,
+        max_tokens: int,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """Stream response text chunks from the provider"""
+        request = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": max_tokens,
+            "temperature": 0.7,
+            "stream": True,
+        }
+        if timeout is not None:
+            request["timeout"] = timeout
+
+        response = await self.client.chat.completions.create(**request)
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class ProviderRouter:
+    """
+    Routes LLM requests across several providers with hedging
+
+    The provider with the lowest median time-to-first-token is tried first.
+    If it hasn't produced a token within its `hedge_percentile` latency, a
+    hedged request goes to the next provider. The first complete response
+    wins and the other requests are cancelled.
+    """
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        hedge_percentile: float = 95.0,
+        hedge_delay: float = 1.5,
+        min_samples: int = 5
+    ):
+        self.providers = providers
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_samples = min_samples
+
+    @classmethod
+    def from_env(cls) -> "ProviderRouter":
+        names = os.getenv("LLM_ROUTER_PROVIDERS", "openrouter,openai").split(",")
+        providers = [Provider.from_env(name.strip()) for name in names if name.strip()]
+        if not providers:
+            raise ValueError("LLM_ROUTER_PROVIDERS is empty")
+
+        return cls(
+            providers=providers,
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+            hedge_delay=float(os.getenv("LLM_HEDGE_DELAY_MS", "1500")) / 1000.0,
+            min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "5")),
+        )
+
+    def ranked(self) -> List[Provider]:
+        """Providers with a closed (or trial) breaker, fastest first"""
+        available = [p for p in self.providers if p.breaker.allow()]
+
+        def median(provider: Provider) -> float:
+            p50 = provider.tracker.percentile(50)
+            if p50 is not None:
+                return p50
+            # Never-tried providers go first so they get measured; one with an
+            # attempt still in flight has no evidence of being fast
+            return 0.0 if provider.tracker.attempts == 0 else float("inf")
+
+        # Ties keep the configured order
+        return sorted(available, key=median)
+
+    def _hedge_after(self, provider: Provider) -> float:
+        """Seconds to wait for a first token before hedging"""
+        if len(provider.tracker.samples) < self.min_samples:
+            return self.hedge_delay
+        return provider.tracker.percentile(self.hedge_percentile)
+
+    async def _attempt(
+        self,
+        provider: Provider,
+        prompt: str,
+        max_tokens: int,
+        first_token: asyncio.Event,
+        hedged_around: asyncio.Event,
+        deadline: Optional[Deadline]
+    ) -> str:
+        started = time.monotonic()
+        chunks = []
+        provider.tracker.attempts += 1
+        try:
+            timeout = deadline.remaining() if deadline is not None else None
+            async for chunk in provider.stream(prompt, max_tokens, timeout=timeout):
+                if not chunks:
+                    provider.tracker.record(time.monotonic() - started)
+                    first_token.set()
+                chunks.append(chunk)
+        except asyncio.CancelledError:
+            # A hedge loser isn't a provider failure. If this attempt was
+            # hedged around, it was at least this slow; a late-launched
+            # backup's elapsed time says little about its real latency
+            if not chunks and hedged_around.is_set():
+                provider.tracker.record_censored(time.monotonic() - started)
+            provider.breaker.release()
+            raise
+        except Exception:
+            # Failures record no latency (a refused connection is fast, not
+            # healthy); the breaker handles them. A timeout from the caller's own deadline says nothing about
+            # the provider's health
+            if deadline is not None and deadline.expired():
+                provider.breaker.release()
+            else:
+                provider.breaker.record_failure()
+            raise
+
+        provider.breaker.record_success()
+        return "".join(chunks)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: int = 500,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """
+        Generate a response from the fastest healthy provider
+
+        Raises:
+            NoProviderAvailable: if all providers fail or are circuit-broken
+            DeadlineExceeded: if no response arrives before the deadline
+        """
+        candidates = self.ranked()
+        loop = asyncio.get_running_loop()
+        first_token = asyncio.Event()
+        pending = set()
+        errors = []
+        # One event per launched attempt, set once a hedge is sent around it
+        hedge_events = []
+
+        def launch() -> Optional[float]:
+            """Start the next provider whose breaker admits a request; return its hedge time"""
+            while candidates:
+                provider = candidates.pop(0)
+                if provider.breaker.acquire():
+                    hedge_events.append(asyncio.Event())
+                    pending.add(asyncio.create_task(
+                        self._attempt(provider, prompt, max_tokens, first_token, hedge_events[-1], deadline),
+                        name=f"llm-{provider.name}"
+                    ))
+                    return loop.time() + self._hedge_after(provider)
+            return None
+
+        hedge_at = launch()
+        if hedge_at is None:
+            raise NoProviderAvailable("All LLM providers have open circuit breakers")
+        try:
+            while True:
+                timeout = None
+                if candidates and not first_token.is_set():
+                    timeout = max(0.0, hedge_at - loop.time())
+                if deadline is not None:
+                    timeout = deadline.remaining() if timeout is None else min(timeout, deadline.remaining())
+
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(f"{task.get_name()[4:]}: {task.exception()}")
+
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded("No LLM provider answered before the deadline")
+
+                hedge_due = not first_token.is_set() and loop.time() >= hedge_at
+                if not pending or hedge_due:
+                    previous = hedge_events[-1]
+                    next_hedge_at = launch()
+                    if next_hedge_at is not None:
+                        if hedge_due:
+                            previous.set()
+                        hedge_at = next_hedge_at
+                    elif not pending:
+                        raise NoProviderAvailable(f"All LLM providers failed ({'; '.join(errors)})")
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from backend.admission import (
+    AdmissionController,
+    AdmissionRejected,
+    Deadline,
+)
+
+
+@pytest.fixture
+def controller():
+    """Fixture with one slot and a one-request queue"""
+    return AdmissionController(
+        name="Test service",
+        max_concurrency=1,
+        max_queue=1,
+        timeout=0.5,
+        retry_after=3
+    )
+
+
+def test_deadline_remaining():
+    """Test deadline budget accounting"""
+    deadline = Deadline(10)
+    assert deadline.covers(5)
+    assert not deadline.expired()
+
+    expired = Deadline(0)
+    assert expired.expired()
+    assert expired.remaining() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_admit_yields_deadline(controller):
+    """Test admitted requests receive a deadline and release their slot"""
+    async with controller.admit() as deadline:
+        assert isinstance(deadline, Deadline)
+        assert controller.active == 1
+
+    assert controller.active == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full(controller):
+    """Test requests beyond concurrency + queue are rejected immediately"""
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold_slot())
+    queued = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0.01)
+    assert controller.waiting == 1
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with controller.admit():
+            pass
+    assert exc_info.value.retry_after == 3
+
+    release.set()
+    await asyncio.gather(holder, queued)
+    assert controller.active == 0
+    assert controller.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_wait_exceeds_deadline(controller):
+    """Test queued requests are rejected once their deadline passes"""
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with controller.admit():
+            await release.wait()
+
+    holder = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejected):
+        async with controller.admit(timeout=0.05):
+            pass
+    assert controller.waiting == 0
+
+    release.set()
+    await holder
+
+
+@pytest.mark.asyncio
+async def test_rejects_burst_during_slot_handoff(controller):
+    """Test a burst arriving while a freed slot is handed to a waiter is still shed"""
+    release = asyncio.Event()
+
+    async def hold_slot():
+        async with controller.admit():
+            await release.wait()
+
+    slot = controller.admit()
+    await slot.__aenter__()
+    queued = asyncio.create_task(hold_slot())
+    await asyncio.sleep(0.01)
+    assert controller.waiting == 1
+
+    # Free the slot; the queued request is woken but hasn't resumed yet
+    await slot.__aexit__(None, None, None)
+    burst = [asyncio.create_task(hold_slot()) for _ in range(5)]
+    await asyncio.sleep(0.01)
+
+    assert controller.active + controller.waiting <= 2
+    rejected = [t for t in burst if t.done() and isinstance(t.exception(), AdmissionRejected)]
+    assert len(rejected) == 4
+
+    release.set()
+    await asyncio.gather(queued, *burst, return_exceptions=True)
+    assert controller.active == 0
+    assert controller.waiting == 0
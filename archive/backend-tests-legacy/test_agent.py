@@ -0,0 +1,28 @@
+import pytest
+from backend.agent import SimpleAgent, Deadline
+
+
+@pytest.fixture
+def agent():
+    """Fixture to create an enabled agent"""
+    agent = SimpleAgent()
+    agent.enabled = True
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_agent_completes_within_deadline(agent):
+    """Test agent runs all steps when the deadline allows"""
+    result = await agent.execute("Analyze the architecture", deadline=Deadline(10))
+    
+    assert result["status"] == "completed"
+    assert len(result["steps"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_agent_stops_at_deadline(agent):
+    """Test agent skips remaining steps once the deadline has passed"""
+    result = await agent.execute("Analyze the architecture", deadline=Deadline(0))
+    
+    assert result["status"] == "timeout"
+    assert result["steps"] == []
@@ -78,3 +78,22 @@ async def test_invalid_query():
         )
     
     assert response.status_code == 422  # Validation error
+
+
+@pytest.mark.asyncio
+async def test_query_rejected_when_overloaded(monkeypatch):
+    """Test query endpoint sheds load with 503 and Retry-After"""
+    from backend import main
+    
+    # Use the same AdmissionController class main.py registered the 503 handler for
+    controller = type(main.query_admission)(
+        "Query service", max_concurrency=0, max_queue=0, timeout=1, retry_after=7
+    )
+    monkeypatch.setattr(main, "query_admission", controller)
+    
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.post("/api/query", json={"query": "What is RAG?"})
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert "error" in response.json()
@@ -1,6 +1,10 @@
+import threading
+import time
 import pytest
 import numpy as np
-from backend.rag import RAGSystem, LLMClient
+from types import SimpleNamespace
+# Deadline types via backend.rag so they match the classes rag.py catches
+from backend.rag import RAGSystem, LLMClient, Deadline, DeadlineExceeded
 
 
 @pytest.fixture
@@ -65,7 +69,7 @@ async def test_rag_query_with_history(rag_system):
 def test_llm_client_initialization(llm_client):
     """Test LLM client initializes correctly"""
     assert llm_client is not None
-    assert llm_client.provider in ["openrouter", "openai", "mock"]
+    assert llm_client.provider in ["openrouter", "openai", "router", "mock"]
 
 
 @pytest.mark.asyncio
@@ -90,3 +94,99 @@ async def test_llm_mock_response(llm_client):
     
     assert isinstance(response, str)
     assert "rag" in response.lower() or "retrieval" in response.lower()
+
+
+class StubEmbeddingModel:
+    """Embedding model stub returning zero vectors"""
+    
+    def encode(self, texts):
+        return np.zeros((len(texts), 4), dtype=np.float32)
+
+
+class ThreadRecordingEmbeddingModel(StubEmbeddingModel):
+    """Embedding model stub that records which thread encoded"""
+    
+    def encode(self, texts):
+        self.thread = threading.current_thread()
+        return super().encode(texts)
+
+
+class StubIndex:
+    """FAISS index stub returning ids in order"""
+    
+    def search(self, query_embedding, k):
+        return np.zeros((1, k), dtype=np.float32), np.array([list(range(k))])
+
+
+class SlowCompletions:
+    """Provider stub that answers too slowly"""
+    
+    def create(self, **kwargs):
+        time.sleep(0.5)
+        return None
+
+
+@pytest.fixture
+def stub_rag(rag_system):
+    """RAG system with a stub index so retrieval always runs"""
+    rag_system.embedding_model = StubEmbeddingModel()
+    rag_system.index = StubIndex()
+    rag_system.reranker = None
+    rag_system.metadata = [
+        {"text": "RAG combines retrieval with generation.", "title": "What is RAG?", "url": "/rag"},
+        {"text": "FAISS searches dense vectors.", "title": "FAISS Overview", "url": "/faiss"},
+    ]
+    return rag_system
+
+
+@pytest.mark.asyncio
+async def test_rag_query_degrades_without_budget(stub_rag):
+    """Test RAG query skips generation when the deadline can't cover it"""
+    stub_rag.llm_min_budget = 2
+    
+    result = await stub_rag.query(
+        query="What is RAG?",
+        deadline=Deadline(0.5)
+    )
+    
+    assert result["degraded"] is True
+    assert [s["title"] for s in result["sources"]] == ["What is RAG?", "FAISS Overview"]
+
+
+@pytest.mark.asyncio
+async def test_rag_query_sources_only_when_llm_times_out(stub_rag):
+    """Test RAG query returns sources only when generation hits the deadline"""
+    class TimedOutLLM:
+        provider = "openai"
+        
+        async def generate(self, prompt, max_tokens=500, deadline=None):
+            raise DeadlineExceeded("too slow")
+    
+    stub_rag.llm_min_budget = 0
+    stub_rag.llm_client = TimedOutLLM()
+    
+    result = await stub_rag.query(query="What is RAG?", deadline=Deadline(5))
+    
+    assert result["degraded"] is True
+    assert len(result["sources"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_rag_query_retrieves_off_event_loop(stub_rag):
+    """Test CPU-bound retrieval doesn't run on the event loop thread"""
+    stub_rag.embedding_model = ThreadRecordingEmbeddingModel()
+    
+    await stub_rag.query(query="What is RAG?")
+    
+    assert stub_rag.embedding_model.thread is not threading.current_thread()
+
+
+@pytest.mark.asyncio
+async def test_llm_generate_raises_at_deadline(llm_client):
+    """Test LLM generation stops waiting for a slow provider at the deadline"""
+    llm_client.provider = "openai"
+    llm_client.model = "stub"
+    llm_client.client = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+    
+    with pytest.raises(DeadlineExceeded):
+        await llm_client.generate("What is RAG?", deadline=Deadline(0.05))
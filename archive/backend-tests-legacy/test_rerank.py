@@ -0,0 +1,66 @@
+import pytest
+from backend.rerank import CrossEncoderReranker, ScoreCache
+
+
+class KeywordModel:
+    """Stub cross-encoder that scores by keyword overlap and counts calls"""
+
+    def __init__(self):
+        self.pairs_scored = 0
+
+    def predict(self, pairs, batch_size=32):
+        self.pairs_scored += len(pairs)
+        return [len(set(q.lower().split()) & set(t.lower().split())) for q, t in pairs]
+
+
+@pytest.fixture
+def candidates():
+    """Candidates in FAISS order, least relevant first"""
+    return [
+        {"id": 0, "text": "deployment on vercel"},
+        {"id": 1, "text": "agents plan tasks"},
+        {"id": 2, "text": "rag retrieval combines search with generation"},
+    ]
+
+
+@pytest.fixture
+def reranker():
+    """Fixture to create a reranker with the stub model"""
+    return CrossEncoderReranker(model=KeywordModel(), batch_size=2, budget_ms=1000, cache_size=8)
+
+
+def test_rerank_orders_by_score(reranker, candidates):
+    """Test reranking keeps the highest scoring documents"""
+    top = reranker.rerank("rag retrieval generation", candidates, top_n=2)
+
+    assert [doc["id"] for doc in top] == [2, 0]
+
+
+def test_rerank_uses_cache(reranker, candidates):
+    """Test repeated (query, doc_id) pairs are served from the cache"""
+    reranker.rerank("rag retrieval", candidates, top_n=3)
+    reranker.rerank("rag retrieval", candidates, top_n=3)
+
+    assert reranker.model.pairs_scored == 3
+    assert len(reranker.cache) == 3
+
+
+def test_rerank_exhausted_budget_keeps_retrieval_order(reranker, candidates):
+    """Test a zero budget falls back to the FAISS ranking"""
+    top = reranker.rerank("rag retrieval", candidates, top_n=2, budget_ms=0)
+
+    assert [doc["id"] for doc in top] == [0, 1]
+    assert reranker.model.pairs_scored == 0
+
+
+def test_score_cache_evicts_least_recently_used():
+    """Test LRU eviction in the score cache"""
+    cache = ScoreCache(max_size=2)
+    cache.put("q", 1, 0.1)
+    cache.put("q", 2, 0.2)
+    cache.get("q", 1)
+    cache.put("q", 3, 0.3)
+
+    assert cache.get("q", 2) is None
+    assert cache.get("q", 1) == 0.1
+    assert cache.get("q", 3) == 0.3
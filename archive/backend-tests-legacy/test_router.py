@@ -0,0 +1,233 @@
+import asyncio
+import json
+import httpx
+import pytest
+from openai import AsyncOpenAI
+from backend.router import (
+    CircuitBreaker,
+    Deadline,
+    DeadlineExceeded,
+    LatencyTracker,
+    NoProviderAvailable,
+    Provider,
+    ProviderRouter,
+)
+
+
+class StubProvider(Provider):
+    """Provider that answers after a fixed delay, or fails"""
+
+    def __init__(self, name, delay=0.0, fail=False):
+        super().__init__(name, client=None, model="stub")
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.cancelled = False
+
+    async def stream(self, prompt, max_tokens, timeout=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        yield f"answer from {self.name}"
+
+
+def stub_endpoint(delay=0.0, text="hello"):
+    """OpenAI-compatible client backed by a local streaming stub endpoint"""
+    async def handler(request):
+        await asyncio.sleep(delay)
+        chunk = {
+            "id": "chunk-1",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "stub",
+            "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+        }
+        body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode())
+
+    return AsyncOpenAI(
+        base_url="http://stub.local/v1",
+        api_key="stub",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_primary_answers_without_hedge():
+    """Test a fast primary answers alone"""
+    primary, backup = StubProvider("primary"), StubProvider("backup")
+    router = ProviderRouter([primary, backup], hedge_delay=0.5)
+
+    assert await router.generate("What is RAG?") == "answer from primary"
+    assert backup.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    """Test a hedged request wins over a slow primary, which is cancelled"""
+    primary, backup = StubProvider("primary", delay=1.0), StubProvider("backup")
+    router = ProviderRouter([primary, backup], hedge_delay=0.05)
+
+    assert await router.generate("What is RAG?") == "answer from backup"
+    assert primary.cancelled
+    assert primary.breaker.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_falls_over_and_opens_breaker():
+    """Test failures move on to the next provider and trip the breaker"""
+    primary, backup = StubProvider("primary", fail=True), StubProvider("backup")
+    primary.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    router = ProviderRouter([primary, backup], hedge_delay=0.5)
+
+    assert await router.generate("What is RAG?") == "answer from backup"
+    assert not primary.breaker.allow()
+    assert router.ranked() == [backup]
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing():
+    """Test an error is raised when no provider can answer"""
+    router = ProviderRouter([StubProvider("a", fail=True), StubProvider("b", fail=True)])
+
+    with pytest.raises(NoProviderAvailable):
+        await router.generate("What is RAG?")
+
+
+@pytest.mark.asyncio
+async def test_deadline_cancels_pending_requests():
+    """Test the deadline bounds the whole hedged request"""
+    slow = StubProvider("slow", delay=1.0)
+    router = ProviderRouter([slow])
+
+    with pytest.raises(DeadlineExceeded):
+        await router.generate("What is RAG?", deadline=Deadline(0.05))
+    assert slow.cancelled
+
+
+@pytest.mark.asyncio
+async def test_repeated_hedging_demotes_slow_primary():
+    """Test a provider that keeps getting hedged around stops being primary"""
+    primary, backup = StubProvider("primary", delay=0.3), StubProvider("backup")
+    router = ProviderRouter([primary, backup], hedge_delay=0.05)
+
+    for _ in range(10):
+        assert await router.generate("What is RAG?") == "answer from backup"
+
+    assert primary.calls == 1
+    assert primary.tracker.percentile(50) >= 0.05
+    assert router.ranked() == [backup, primary]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_slow_backup_is_not_promoted():
+    """Test a late-launched backup cancelled by a fast primary isn't ranked first"""
+    fast, slow = StubProvider("fast", delay=0.05), StubProvider("slow", delay=1.0)
+    router = ProviderRouter([fast, slow], hedge_delay=0.02)
+
+    for _ in range(6):
+        assert router.ranked()[0] is fast
+        assert await router.generate("What is RAG?") == "answer from fast"
+
+    # Hedged until the fast provider had enough samples for its own p95
+    assert slow.calls >= 1
+    assert len(slow.tracker.samples) == 0
+    assert router.ranked() == [fast, slow]
+
+
+@pytest.mark.asyncio
+async def test_fast_failures_record_no_latency():
+    """Test a provider that fails immediately doesn't look fast"""
+    refusing, backup = StubProvider("refusing", fail=True), StubProvider("backup", delay=0.02)
+    refusing.breaker = CircuitBreaker(failure_threshold=10, reset_timeout=60)
+    router = ProviderRouter([refusing, backup], hedge_delay=0.5)
+
+    assert await router.generate("What is RAG?") == "answer from backup"
+
+    assert len(refusing.tracker.samples) == 0
+    assert router.ranked() == [backup, refusing]
+
+
+def test_censored_samples_only_raise_the_estimate():
+    """Test lower bounds below the median are ignored"""
+    tracker = LatencyTracker()
+    for _ in range(3):
+        tracker.record(0.5)
+
+    tracker.record_censored(0.1)
+    assert len(tracker.samples) == 3
+
+    tracker.record_censored(0.9)
+    assert len(tracker.samples) == 4
+
+
+@pytest.mark.asyncio
+async def test_deadline_timeout_does_not_trip_breaker():
+    """Test a provider failing after the caller's deadline isn't penalised"""
+    provider = StubProvider("slow", delay=0.05, fail=True)
+    provider.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    router = ProviderRouter([provider])
+
+    with pytest.raises(RuntimeError):
+        await router._attempt(provider, "What is RAG?", 50, asyncio.Event(), asyncio.Event(), Deadline(0.01))
+
+    assert provider.breaker.state == "closed"
+    assert provider.breaker.failures == 0
+
+
+def test_half_open_breaker_allows_single_trial():
+    """Test a recovering provider gets one trial request at a time"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half_open"
+    assert breaker.acquire()
+    assert not breaker.acquire()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.acquire() and breaker.acquire()
+
+
+@pytest.mark.asyncio
+async def test_half_open_provider_skipped_while_trial_in_flight():
+    """Test concurrent requests don't pile onto a half-open provider"""
+    recovering, backup = StubProvider("recovering", delay=0.2), StubProvider("backup")
+    recovering.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    recovering.breaker.record_failure()
+    router = ProviderRouter([recovering, backup], hedge_delay=1.0)
+
+    results = await asyncio.gather(*(router.generate("What is RAG?") for _ in range(4)))
+
+    assert recovering.calls == 1
+    assert results.count("answer from recovering") == 1
+    assert recovering.breaker.state == "closed"
+
+
+def test_latency_tracker_picks_primary():
+    """Test the provider with the lowest median latency goes first"""
+    fast, slow = StubProvider("fast"), StubProvider("slow")
+    for _ in range(5):
+        fast.tracker.record(0.1)
+        slow.tracker.record(0.8)
+    router = ProviderRouter([slow, fast])
+
+    assert router.ranked() == [fast, slow]
+    assert LatencyTracker().percentile(95) is None
+
+
+@pytest.mark.asyncio
+async def test_hedge_against_local_stub_endpoints():
+    """Test hedging across two OpenAI-compatible stub endpoints"""
+    slow = Provider("slow", client=stub_endpoint(delay=1.0, text="slow"), model="stub")
+    fast = Provider("fast", client=stub_endpoint(text="fast"), model="stub")
+    router = ProviderRouter([slow, fast], hedge_delay=0.05)
+
+    assert await router.generate("What is RAG?") == "fast"
+    assert len(fast.tracker.samples) == 1
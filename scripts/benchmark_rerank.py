@@ -0,0 +1,80 @@
+"""
+Script to compare retrieval with and without cross-encoder reranking
+
+Uses the offline sample index and the labeled queries in
+data/sample/benchmark_queries.json. Reports recall@k, MRR and retrieval
+latency for the FAISS-only baseline and the reranking stage:
+    python scripts/generate_embeddings.py   # if the index is missing
+    python scripts/benchmark_rerank.py [k]
+"""
+
+import json
+import os
+import sys
+import time
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "archive", "backend-fastapi-legacy")
+sys.path.insert(0, os.path.abspath(BACKEND_DIR))
+
+from rag import RAGSystem  # noqa: E402
+from rerank import CrossEncoderReranker  # noqa: E402
+
+QUERIES_PATH = "data/sample/benchmark_queries.json"
+
+
+def evaluate(rag, queries, k, rerank):
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for item in queries:
+        start = time.perf_counter()
+        docs = rag.retrieve(item["query"], k=k, rerank=rerank)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        ids = [doc["id"] for doc in docs]
+        relevant = set(item["relevant"])
+        recalls.append(len(relevant.intersection(ids)) / len(relevant))
+        reciprocal_ranks.append(
+            next((1.0 / rank for rank, doc_id in enumerate(ids, 1) if doc_id in relevant), 0.0)
+        )
+
+    return {
+        "recall": float(np.mean(recalls)),
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def benchmark(k=3):
+    print("Loading RAG system...")
+    rag = RAGSystem()
+    if not rag.is_available():
+        print("RAG system is not available: the embedding model or FAISS index failed to load.")
+        print("Check the errors above, or run scripts/generate_embeddings.py if the index is missing.")
+        return
+
+    if rag.reranker is None:
+        print("Loading cross-encoder...")
+        rag.reranker = CrossEncoderReranker()
+
+    with open(QUERIES_PATH, 'r') as f:
+        queries = json.load(f)
+
+    # Warm up both models so the first query doesn't skew latency
+    rag.retrieve(queries[0]["query"], k=k, rerank=True)
+    rag.reranker.cache.clear()
+
+    print(f"Evaluating {len(queries)} queries at k={k}...")
+    results = {
+        "baseline": evaluate(rag, queries, k, rerank=False),
+        "rerank (cold cache)": evaluate(rag, queries, k, rerank=True),
+        "rerank (warm cache)": evaluate(rag, queries, k, rerank=True),
+    }
+
+    print(f"\n{'mode':<22}{'recall@' + str(k):>10}{'MRR':>8}{'p50 ms':>10}{'p95 ms':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<22}{r['recall']:>10.3f}{r['mrr']:>8.3f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 3)